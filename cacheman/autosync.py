@@ -1,7 +1,6 @@
 from collections import namedtuple, deque
 from datetime import datetime
 from operator import attrgetter
-from builtins import range
 
 from .cachewrap import PersistentCache
 
@@ -82,17 +81,50 @@ class AutoSyncCacheBase(object):
             pass # Edit is too far back or in the future, skip it
 
     def __setitem__(self, *args, **kwargs):
-        self._check_contents_present()
-        ret_val = self.contents.__setitem__(*args, **kwargs)
+        ret_val = self.base_class.__setitem__(self, *args, **kwargs)
         self.track_edit()
         return ret_val
 
     def __delitem__(self, *args, **kwargs):
-        self._check_contents_present()
-        ret_val = self.contents.__delitem__(*args, **kwargs)
+        ret_val = self.base_class.__delitem__(self, *args, **kwargs)
         self.track_edit()
         return ret_val
 
+    def update(self, *args, **kwargs):
+        other = args[0] if args else ()
+        if not hasattr(other, '__len__'):
+            # Materialize one-shot iterables so they survive being counted
+            other = list(other)
+            args = (other,)
+        ret_val = self.base_class.update(self, *args, **kwargs)
+        # One edit per affected key, matching the per-key __setitem__ calls
+        # the MutableMapping mixin used to make
+        count = len(other) + len(kwargs)
+        if count:
+            self.track_edit(count)
+        return ret_val
+
+    def pop(self, key, *args, **kwargs):
+        edited = key in self
+        ret_val = self.base_class.pop(self, key, *args, **kwargs)
+        if edited:
+            self.track_edit()
+        return ret_val
+
+    def setdefault(self, key, *args, **kwargs):
+        edited = key not in self
+        ret_val = self.base_class.setdefault(self, key, *args, **kwargs)
+        if edited:
+            self.track_edit()
+        return ret_val
+
+    def clear(self):
+        count = len(self)
+        ret_val = self.base_class.clear(self)
+        if count:
+            self.track_edit(count)
+        return ret_val
+
     def _build(self, *args, **kwargs):
         self.clear_bucket_counts()
         return self.base_class._build(self, *args, **kwargs)
@@ -1,4 +1,10 @@
-from collections import MutableMapping
+import sys
+
+# 3.8+ compatibility:
+if sys.version_info[:2] >= (3, 8):
+    from collections.abc import MutableMapping
+else:
+    from collections import MutableMapping
 
 class IgnoredDict(MutableMapping):
     '''
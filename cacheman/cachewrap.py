@@ -1,4 +1,7 @@
+import copy
 import sys
+import weakref
+from collections import deque, namedtuple
 
 # 3.8+ compatibility:
 if sys.version_info[:2] >= (3, 8):
@@ -6,10 +9,27 @@ if sys.version_info[:2] >= (3, 8):
 else:
     from collections import MutableMapping
 
-from past.builtins import basestring
-
 from .registers import *
 
+CALLBACK_NAMES = ['loader', 'async_presaver', 'async_saver', 'async_cleaner', 'saver', 'builder', 'deleter',
+                  'pre_processor', 'post_processor', 'validator']
+
+# All callbacks live in one preallocated struct rather than ten separate slots
+_Callbacks = namedtuple('_Callbacks', CALLBACK_NAMES)
+
+def _callback_property(index, name):
+    def getter(self):
+        return self._cb[index]
+    def setter(self, value):
+        self._cb = self._cb._replace(**{name: value})
+    return property(getter, setter)
+
+def _gc_save(cache):
+    try:
+        cache.save()
+    except Exception as e:
+        print("Warning: ignored error saving '{}' cache at exit - {}".format(cache.name, repr(e)))
+
 class CacheWrap(MutableMapping, object):
     '''
     A class designed to immitate the contents it holds with a capability to reload,
@@ -17,40 +37,106 @@ class CacheWrap(MutableMapping, object):
     the cache object.
     '''
 
-    CALLBACK_NAMES = ['loader', 'async_presaver', 'async_saver', 'async_cleaner', 'saver', 'builder', 'deleter',
-                      'pre_processor', 'post_processor', 'validator']
+    CALLBACK_NAMES = CALLBACK_NAMES
+
+    # Fixed slot layout instead of a per-instance __dict__ -- cheaper to build
+    # and smaller when many caches are registered (subclasses may still add a
+    # __dict__ by declaring attributes of their own)
+    __slots__ = ('manager', 'name', '_contents', '_loaded', '_loading', '_dirty',
+                 '_contents_getitem', '_contents_setitem', '_contents_delitem',
+                 '_contents_contains', '_contents_iter', '_contents_len',
+                 'dependents', '_dependent_cache_ref', 'async_save_enabled', 'async_timeout',
+                 'threaded_save', 'save_on_blank',
+                 'optimize_on_save', 'durable', 'delete_triggered', '_save_finalizer', '_load_stamp',
+                 '_cb', '__weakref__')
+
+    # Subclass-defined callback methods shadow these, as do instance attributes
+    # assigned over them -- both land ahead of the property in lookup order
+    loader = _callback_property(0, 'loader')
+    async_presaver = _callback_property(1, 'async_presaver')
+    async_saver = _callback_property(2, 'async_saver')
+    async_cleaner = _callback_property(3, 'async_cleaner')
+    saver = _callback_property(4, 'saver')
+    builder = _callback_property(5, 'builder')
+    deleter = _callback_property(6, 'deleter')
+    pre_processor = _callback_property(7, 'pre_processor')
+    post_processor = _callback_property(8, 'post_processor')
+    validator = _callback_property(9, 'validator')
 
     def __init__(self, cache_name, contents=None, dependents=None, cache_manager=None,
-                 async_save=False, async_timeout=60, save_on_blank_cache=True, **kwargs):
+                 async_save=False, async_timeout=60, save_on_blank_cache=True,
+                 optimize_on_save=False, lazy=True, durable=False, save_on_gc=False,
+                 threaded_save=False, **kwargs):
+        # Set first so __del__ reads a real slot instead of falling into
+        # __getattr__, which would lazy load (and save) the contents from the
+        # GC path -- possibly during interpreter teardown
+        self.delete_triggered = False
         if cache_manager:
             self.manager = cache_manager
         else:
             from .cacher import get_cache_manager # Import here to avoid circular import
             self.manager = get_cache_manager()
-        self.contents = contents
+        # Block lazy loading until construction completes
+        self._loaded = True
+        self._loading = False
+        self._contents = contents
+        self._rebind_contents_methods(contents)
         self.name = cache_name
-        self.dependents = set([self._convert_dependent_to_name(d) for d in dependents] if dependents else [])
+        # Dependents are normalized to name strings up front so traversals are pure
+        # string hashing and can lean on C-speed set operations
+        self.dependents = set(d if type(d) is str else d.name for d in dependents) if dependents else set()
+        # Lazily filled name->cache memo so repeated traversals skip manager lookups
+        self._dependent_cache_ref = {}
         # Preserve backwards compatibility
         self.async_save_enabled = kwargs.get('async', async_save)
         self.async_timeout = async_timeout
+        # Offload saves to a worker thread so __exit__/save return immediately;
+        # unlike the fork-based async_save this also works on Windows
+        self.threaded_save = threaded_save
         self.save_on_blank = save_on_blank_cache
-
-        for name in CacheWrap.CALLBACK_NAMES:
-            setattr(self, name, kwargs[name] if name in kwargs else getattr(self, name, None))
+        # Trades a slower save for smaller files and faster loads -- best for read-heavy caches
+        self.optimize_on_save = optimize_on_save
+        # Contents handed to us directly have never been persisted, so they start dirty
+        self._dirty = contents is not None
+        # (file fingerprint, contents) pair from the last pickle read/write --
+        # lets load() skip the unpickle when nothing changed
+        self._load_stamp = None
+        # fsync saved content before the rename; costs save latency, only worth
+        # it for caches that must survive power loss
+        self.durable = durable
+
+        # One batched construction instead of ten attribute assignments,
+        # starting from whatever the subclass defines
+        self._cb = _Callbacks._make(getattr(self, name, None) for name in CALLBACK_NAMES)
+        # Explicit kwargs take precedence (even None, to disable a subclass
+        # callback) and must be set through setattr so they shadow any
+        # subclass-defined callback method of the same name
+        for name in CALLBACK_NAMES:
+            if name in kwargs:
+                setattr(self, name, kwargs[name])
+
+        if save_on_gc:
+            # The finalizer holds a reference, so it fires at interpreter exit
+            # (before module teardown, unlike __del__) rather than on collection
+            self._save_finalizer = weakref.finalize(self, _gc_save, self)
 
         if not self.manager.cache_registered(self.name):
             self.manager.register_cache(self.name, contents=self)
 
-        if self.contents is None:
-            self.load_or_build()
+        if contents is None:
+            if lazy:
+                # Defer the load/build cost until the contents are first touched
+                self._loaded = False
+            else:
+                self.load_or_build()
 
     def __del__(self):
-        if not hasattr(self, 'delete_triggered'):
+        # No save here -- GC-time saves are slow and unreliable (cycles,
+        # interpreter shutdown order). Use a with block for deterministic
+        # saves or save_on_gc=True for an exit-time finalizer.
+        if not self.delete_triggered:
             # Avoid infinite recursion if dependent objects trigger delete chains
             self.delete_triggered = True
-            # Reimport this library or we'll have import failures in later pythons during cleanup
-            import psutil
-            self.save()
             if self.name in self.manager.cache_by_name:
                 del self.manager.cache_by_name[self.name]
 
@@ -64,46 +150,167 @@ class CacheWrap(MutableMapping, object):
         '''
         If a method or attribute is missing, use the content's attributes
         '''
-        for getter in ['__getattribute__', '__getattr__']:
-            if hasattr(self.contents, getter):
-                try:
-                    return getattr(self.contents, getter)(name)
-                except AttributeError:
-                    pass
-            try:
-                return getattr(self.contents, name)
-            except AttributeError:
-                pass
-        raise AttributeError("'{}' and '{}' objects have no attribute '{}'".format(self.__class__.__name__, self.contents.__class__.__name__, name))
+        contents = object.__getattribute__(self, 'contents')
+        try:
+            # getattr already walks __getattribute__/__getattr__ on the contents
+            return getattr(contents, name)
+        except AttributeError:
+            raise AttributeError("'{}' and '{}' objects have no attribute '{}'".format(
+                self.__class__.__name__, contents.__class__.__name__, name))
+
+    @property
+    def contents(self):
+        if not self._loaded and not self._loading:
+            self._ensure_loaded()
+        return self._contents
+
+    @contents.setter
+    def contents(self, value):
+        # Any explicit assignment (even None from a failed load) counts as loaded;
+        # laziness only spans construction to first touch
+        self._contents = value
+        self._loaded = True
+        self._rebind_contents_methods(value)
+
+    def _rebind_contents_methods(self, value):
+        '''
+        Caches the contents' bound item methods so the hot dunders skip a
+        per-call attribute resolution. Must run on every contents reassignment.
+        '''
+        if value is None:
+            self._contents_getitem = None
+            self._contents_setitem = None
+            self._contents_delitem = None
+            self._contents_contains = None
+            self._contents_iter = None
+            self._contents_len = None
+        else:
+            self._contents_getitem = getattr(value, '__getitem__', None)
+            self._contents_setitem = getattr(value, '__setitem__', None)
+            self._contents_delitem = getattr(value, '__delitem__', None)
+            self._contents_contains = getattr(value, '__contains__', None)
+            self._contents_iter = getattr(value, '__iter__', None)
+            self._contents_len = getattr(value, '__len__', None)
+
+    def _ensure_loaded(self):
+        self._loading = True
+        try:
+            self.load_or_build()
+        finally:
+            self._loading = False
+            self._loaded = True
 
     def _check_contents_present(self):
         if self.contents is None:
             raise AttributeError("No cache contents defined for '{}'".format(self.name))
 
-    def __contains__(self, *args, **kwargs):
-        if self.contents is None:
-            return False
-        return self.contents.__contains__(*args, **kwargs)
+    # The read dunders assume the bound method is present and fall back on
+    # TypeError (None isn't callable), so the loaded-and-bound common case
+    # pays no branch at all. Instance attributes can't shadow special methods
+    # -- CPython looks those up on the type -- so this is as short as the
+    # dispatch can get.
+    def __contains__(self, key):
+        try:
+            return self._contents_contains(key)
+        except TypeError:
+            if self._contents_contains is not None:
+                raise
+            contents = self.contents
+            if contents is None:
+                return False
+            return (self._contents_contains or contents.__contains__)(key)
+
+    # MutableMapping's mixin methods route every element through the
+    # Python-level __getitem__/__iter__/__len__; delegate straight to the
+    # contents so bulk operations run at C speed. Inheritance is kept for
+    # isinstance checks.
+    def keys(self):
+        self._check_contents_present()
+        return self.contents.keys()
 
-    def __getitem__(self, *args, **kwargs):
+    def values(self):
         self._check_contents_present()
-        return self.contents.__getitem__(*args, **kwargs)
+        return self.contents.values()
 
-    def __setitem__(self, *args, **kwargs):
+    def items(self):
         self._check_contents_present()
-        return self.contents.__setitem__(*args, **kwargs)
+        return self.contents.items()
 
-    def __delitem__(self, *args, **kwargs):
+    def get(self, *args, **kwargs):
         self._check_contents_present()
-        return self.contents.__delitem__(*args, **kwargs)
+        return self.contents.get(*args, **kwargs)
 
-    def __iter__(self):
+    def update(self, *args, **kwargs):
         self._check_contents_present()
-        return self.contents.__iter__()
+        self._dirty = True
+        return self.contents.update(*args, **kwargs)
 
-    def __len__(self):
+    def pop(self, *args, **kwargs):
         self._check_contents_present()
-        return self.contents.__len__()
+        self._dirty = True
+        return self.contents.pop(*args, **kwargs)
+
+    def setdefault(self, *args, **kwargs):
+        self._check_contents_present()
+        self._dirty = True
+        return self.contents.setdefault(*args, **kwargs)
+
+    def clear(self):
+        self._check_contents_present()
+        self._dirty = True
+        return self.contents.clear()
+
+    def __eq__(self, other):
+        if isinstance(other, CacheWrap):
+            other = other.contents
+        return self.contents == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __getitem__(self, key):
+        try:
+            return self._contents_getitem(key)
+        except TypeError:
+            if self._contents_getitem is not None:
+                raise
+            self._check_contents_present()
+            return (self._contents_getitem or self.contents.__getitem__)(key)
+
+    def __setitem__(self, key, value):
+        setter = self._contents_setitem
+        if setter is None:
+            self._check_contents_present()
+            setter = self._contents_setitem or self.contents.__setitem__
+        # Mark dirty after any lazy build above so its save doesn't clear the flag
+        self._dirty = True
+        return setter(key, value)
+
+    def __delitem__(self, key):
+        deleter = self._contents_delitem
+        if deleter is None:
+            self._check_contents_present()
+            deleter = self._contents_delitem or self.contents.__delitem__
+        self._dirty = True
+        return deleter(key)
+
+    def __iter__(self):
+        try:
+            return self._contents_iter()
+        except TypeError:
+            if self._contents_iter is not None:
+                raise
+            self._check_contents_present()
+            return (self._contents_iter or self.contents.__iter__)()
+
+    def __len__(self):
+        try:
+            return self._contents_len()
+        except TypeError:
+            if self._contents_len is not None:
+                raise
+            self._check_contents_present()
+            return (self._contents_len or self.contents.__len__)()
 
     def __str__(self):
         return "{}<{}>".format(self.__class__.__name__, self.contents.__str__())
@@ -112,13 +319,38 @@ class CacheWrap(MutableMapping, object):
         return "{}<{}>".format(self.__class__.__name__, self.contents.__repr__())
 
     def _manager_pickle_loader(self, name):
-        return pickle_loader(self.manager.cache_directory, self.name)
+        stat_key = pickle_stat(self.manager.cache_directory, self.name)
+        stamp = self._load_stamp
+        if (stamp is not None and stat_key is not None and not self._dirty
+                and self.post_processor is None
+                and stamp[0] == stat_key and stamp[1] is self._contents):
+            # The file hasn't changed since we last read or wrote it and memory
+            # still mirrors it -- skip the redundant unpickle. load() still
+            # reapplies the validator to whatever we hand back.
+            return self._contents
+        contents = pickle_loader(self.manager.cache_directory, self.name)
+        # Post-processed contents drift from the file, so don't stamp those
+        if contents is not None and stat_key is not None and self.post_processor is None:
+            self._load_stamp = (stat_key, contents)
+        else:
+            self._load_stamp = None
+        return contents
 
     def _manager_pickle_saver(self, name, contents):
-        return pickle_saver(self.manager.cache_directory, name, contents)
+        result = pickle_saver(self.manager.cache_directory, name, contents, self.optimize_on_save,
+            self.durable)
+        if contents is self._contents:
+            # Disk now mirrors memory; future unchanged loads can short-circuit
+            stat_key = pickle_stat(self.manager.cache_directory, name)
+            self._load_stamp = (stat_key, contents) if stat_key is not None else None
+        else:
+            # Pre-processed (or snapshotted) saves diverge from live contents
+            self._load_stamp = None
+        return result
 
     def _manager_pickle_async_presaver(self, name, contents, extensions):
-        return pickle_pre_saver(self.manager.cache_directory, name, contents, extensions)
+        return pickle_pre_saver(self.manager.cache_directory, name, contents, extensions,
+            self.optimize_on_save, self.durable)
 
     def _manager_pickle_async_mover(self, name, contents, extensions):
         return pickle_mover(self.manager.cache_directory, name, contents, extensions)
@@ -127,14 +359,41 @@ class CacheWrap(MutableMapping, object):
         return pickle_cleaner(self.manager.cache_directory, name, extensions)
 
     def _manager_pickle_deleter(self, name):
+        self._load_stamp = None
         return pickle_deleter(self.manager.cache_directory, name)
 
+    def _resolve_dependent(self, name):
+        cache = self._dependent_cache_ref.get(name)
+        # Check each hit against the registry (still one dict lookup) -- the
+        # memo can otherwise serve a cache that was deregistered, keeping a
+        # dead wrap alive past any replacement registered under the same name
+        if cache is None or self.manager.cache_by_name.get(name) is not cache:
+            cache = self.manager.retrieve_cache(name)
+            self._dependent_cache_ref[name] = cache
+        return cache
+
     def _retrieve_dependent_caches(self, seen_dependents=None):
-        for dependent in self.dependents:
-            if seen_dependents is None or dependent not in seen_dependents:
-                cache = self.manager.retrieve_cache(dependent)
-                if cache is not None:
-                    yield cache
+        unseen = self.dependents - seen_dependents if seen_dependents else self.dependents
+        for dependent in unseen:
+            cache = self._resolve_dependent(dependent)
+            if cache is not None:
+                yield cache
+
+    def _walk_dependents(self, seen_caches):
+        '''
+        Iteratively walks every unseen cache reachable through dependents, yielding
+        each exactly once. Marks names in seen_caches so nested traversals that
+        share the set won't revisit nodes or blow the stack on deep graphs.
+        '''
+        pending = deque([self])
+        while pending:
+            cache = pending.popleft()
+            for name in cache.dependents - seen_caches:
+                seen_caches.add(name)
+                dependent = cache._resolve_dependent(name)
+                if dependent is not None:
+                    pending.append(dependent)
+                    yield dependent
 
     def _add_seen_cache(self, seen_caches):
         if seen_caches is None:
@@ -143,7 +402,7 @@ class CacheWrap(MutableMapping, object):
         return seen_caches
 
     def _convert_dependent_to_name(self, dependent):
-        return dependent if isinstance(dependent, basestring) else dependent.name
+        return dependent if type(dependent) is str else dependent.name
 
     def _pre_process(self, contents):
         if self.pre_processor:
@@ -164,6 +423,8 @@ class CacheWrap(MutableMapping, object):
             self.contents = self._post_process(dict_loader())
         else:
             self.contents = self._post_process(self.builder(self.name))
+        # Freshly built contents have never hit disk -- force the write
+        self._dirty = True
         self.save()
 
         return self.contents
@@ -172,14 +433,22 @@ class CacheWrap(MutableMapping, object):
         fork_content_save(name, contents, self.async_presaver, self.async_saver, self.async_cleaner,
             self.async_timeout, self.manager.async_pid_cache)
 
-    def load(self, apply_to_dependents=False, seen_caches=None):
+    def _threaded_save(self, name, contents):
+        # Shallow snapshot so the worker thread isn't racing later mutations
+        thread_content_save(name, copy.copy(contents), self.saver)
+
+    def load(self, apply_to_dependents=False, seen_caches=None, force=False):
         if seen_caches and self.name in seen_caches:
             return
         seen_caches = self._add_seen_cache(seen_caches)
 
+        if force:
+            # Drop the fingerprint so the loader can't skip the re-read
+            self._load_stamp = None
+
         if apply_to_dependents:
-            for dependent in self._retrieve_dependent_caches(seen_caches):
-                dependent.load(apply_to_dependents, seen_caches)
+            for dependent in self._walk_dependents(seen_caches):
+                dependent.load(False)
 
         if self.loader:
             self.contents = self.loader(self.name)
@@ -198,24 +467,40 @@ class CacheWrap(MutableMapping, object):
         else:
             self.contents = None
 
+        # Whatever we now hold mirrors the saved content
+        self._dirty = False
         return self.contents
 
-    def save(self, apply_to_dependents=False, seen_caches=None):
+    def save(self, apply_to_dependents=False, seen_caches=None, force=False):
         if seen_caches and self.name in seen_caches:
             return
         seen_caches = self._add_seen_cache(seen_caches)
 
         if apply_to_dependents:
-            for dependent in self._retrieve_dependent_caches(seen_caches):
-                dependent.save(apply_to_dependents, seen_caches)
+            for dependent in self._walk_dependents(seen_caches):
+                dependent.save(False)
+
+        if not self._dirty and not force:
+            # Nothing changed since the last save/load -- skip the redundant
+            # write (and don't trigger a lazy load just to throw it away)
+            return self._contents
 
         contents = self._pre_process(self.contents)
         if not self.save_on_blank and not contents:
             return contents
 
-        # Determine if we're doing an async save or not
-        saver = self._async_save if self.async_save_enabled else self.saver
-        return (saver and saver(self.name, contents)) or contents
+        # Determine if we're doing an async (forked or threaded) save or not
+        if self.async_save_enabled:
+            saver = self._async_save
+        elif self.threaded_save and self.saver:
+            saver = self._threaded_save
+        else:
+            saver = self.saver
+        if not saver:
+            return contents
+        result = saver(self.name, contents) or contents
+        self._dirty = False
+        return result
 
     def invalidate(self, apply_to_dependents=True, seen_caches=None):
         return self.load(apply_to_dependents, seen_caches)
@@ -229,24 +514,32 @@ class CacheWrap(MutableMapping, object):
         seen_caches = self._add_seen_cache(seen_caches)
 
         if apply_to_dependents:
-            for dependent in self._retrieve_dependent_caches(seen_caches):
-                dependent.delete_saved_content(apply_to_dependents, seen_caches)
+            for dependent in self._walk_dependents(seen_caches):
+                dependent.delete_saved_content(False)
+
+        if self.deleter:
+            self.deleter(self.name)
 
+    def _rebuild_one(self):
+        '''
+        Single-node drop, delete, and rebuild. Skips the disk reload the old
+        invalidate step paid only to have _build immediately overwrite it.
+        '''
+        self.contents = None
         if self.deleter:
             self.deleter(self.name)
+        self._build()
 
     def invalidate_and_rebuild(self, apply_to_dependents=True, seen_caches=None):
         if seen_caches and self.name in seen_caches:
             return
         seen_caches = self._add_seen_cache(seen_caches)
 
-        self.invalidate(False)
-        self.delete_saved_content(False)
-        self._build()
+        self._rebuild_one()
 
         if apply_to_dependents:
-            for dependent in self._retrieve_dependent_caches(seen_caches):
-                dependent.invalidate_and_rebuild(apply_to_dependents, seen_caches)
+            for dependent in self._walk_dependents(seen_caches):
+                dependent._rebuild_one()
 
     def load_or_build(self, apply_to_dependents=True, seen_caches=None):
         if seen_caches and self.name in seen_caches:
@@ -254,8 +547,8 @@ class CacheWrap(MutableMapping, object):
         seen_caches = self._add_seen_cache(seen_caches)
 
         if apply_to_dependents:
-            for dependent in self._retrieve_dependent_caches(seen_caches):
-                dependent.load_or_build(apply_to_dependents, seen_caches)
+            for dependent in self._walk_dependents(seen_caches):
+                dependent.load_or_build(False)
 
         loaded = self.load() is not None
         if not loaded:
@@ -264,7 +557,12 @@ class CacheWrap(MutableMapping, object):
         return loaded, self.contents
 
     def add_dependent(self, dependent):
-        self.dependents.add(dependent)
+        '''
+        Accepts either a cache name or a cache object; only the name is stored.
+        '''
+        self.dependents.add(self._convert_dependent_to_name(dependent))
+        # New edges may shadow previously resolved names -- drop the memo
+        self._dependent_cache_ref = {}
 
 class NonPersistentCache(CacheWrap):
     '''
@@ -329,19 +627,29 @@ class PersistentCache(CacheWrap):
     '''
     A persistent cache which saves and loads from pickle files.
     '''
-    def __init__(self, cache_name, **kwargs):
+    def __init__(self, cache_name, oob_buffers=False, **kwargs):
+        # Out-of-band buffers (pickle protocol 5, Python 3.8+) skip a memory
+        # copy per large bytes/bytearray/numpy payload -- only a win when the
+        # contents are actually dominated by such buffers
+        self.oob_buffers = oob_buffers
         CacheWrap.__init__(self, cache_name, **kwargs)
 
     def loader(self, name):
+        if self.oob_buffers:
+            return pickle_oob_loader(self.manager.cache_directory, name)
         return self._manager_pickle_loader(name)
 
     def saver(self, name, contents):
+        if self.oob_buffers:
+            return pickle_oob_saver(self.manager.cache_directory, name, contents)
         return self._manager_pickle_saver(name, contents)
 
     def deleter(self, name):
         return self._manager_pickle_deleter(name)
 
     def async_presaver(self, name, contents, extensions):
+        if self.oob_buffers:
+            return pickle_oob_pre_saver(self.manager.cache_directory, name, contents, extensions)
         return self._manager_pickle_async_presaver(name, contents, extensions)
 
     def async_saver(self, name, contents, extensions):
@@ -0,0 +1,94 @@
+import os
+import shutil
+import traceback
+
+import msgpack
+
+from .registers import generate_path, ensure_directory
+from .utils import random_name
+from .cachewrap import CacheWrap
+from .autosync import AutoSyncCacheBase
+
+def generate_msgpack_path(cache_dir, cache_name):
+    return generate_path(cache_dir, cache_name, 'msgpack')
+
+def msgpack_saver(cache_dir, cache_name, contents):
+    tmp_exts = ['tmp', random_name()]
+    try:
+        try:
+            msgpack_pre_saver(cache_dir, cache_name, contents, tmp_exts)
+            msgpack_mover(cache_dir, cache_name, contents, tmp_exts)
+        except (IOError, EOFError):
+            traceback.print_exc()
+            raise IOError('Unable to save {} cache'.format(cache_name))
+    except:
+        try: msgpack_cleaner(cache_dir, cache_name, tmp_exts)
+        except: pass
+        raise
+
+def msgpack_pre_saver(cache_dir, cache_name, contents, extensions):
+    ensure_directory(cache_dir)
+    cache_path = generate_msgpack_path(cache_dir, cache_name)
+    with open('.'.join([cache_path] + extensions), 'wb') as msgpack_file:
+        msgpack.pack(contents, msgpack_file, use_bin_type=True)
+
+def msgpack_mover(cache_dir, cache_name, contents, extensions):
+    cache_path = generate_msgpack_path(cache_dir, cache_name)
+    shutil.move('.'.join([cache_path] + extensions), cache_path)
+
+def msgpack_cleaner(cache_dir, cache_name, extensions):
+    cache_path = generate_msgpack_path(cache_dir, cache_name)
+    try: os.remove('.'.join([cache_path] + extensions))
+    except OSError: pass
+
+def msgpack_deleter(cache_dir, cache_name):
+    try:
+        os.remove(generate_msgpack_path(cache_dir, cache_name))
+    except OSError:
+        pass
+
+def msgpack_loader(cache_dir, cache_name):
+    try:
+        with open(generate_msgpack_path(cache_dir, cache_name), 'rb') as msgpack_file:
+            return msgpack.unpack(msgpack_file, raw=False, strict_map_key=False)
+    except (IOError, EOFError, ValueError, msgpack.UnpackException):
+        # msgpack raises plain ValueError for truncated input and ExtraData
+        # (a ValueError subclass) for trailing garbage
+        return None
+
+class MsgpackPersistentCache(CacheWrap):
+    '''
+    A persistent cache which saves and loads from msgpack files. Considerably
+    faster than pickle for caches holding only simple types (dicts of
+    primitives), but unable to round-trip arbitrary objects -- use
+    PersistentCache for those.
+    '''
+    def loader(self, name):
+        return msgpack_loader(self.manager.cache_directory, name)
+
+    def saver(self, name, contents):
+        return msgpack_saver(self.manager.cache_directory, name, contents)
+
+    def deleter(self, name):
+        return msgpack_deleter(self.manager.cache_directory, name)
+
+    def validator(self, contents):
+        # msgpack only preserves simple types; reject anything that drifted
+        # from the dict contract so we rebuild instead of serving bad data
+        return isinstance(contents, dict)
+
+    def async_presaver(self, name, contents, extensions):
+        return msgpack_pre_saver(self.manager.cache_directory, name, contents, extensions)
+
+    def async_saver(self, name, contents, extensions):
+        return msgpack_mover(self.manager.cache_directory, name, contents, extensions)
+
+    def async_cleaner(self, name, extensions):
+        return msgpack_cleaner(self.manager.cache_directory, name, extensions)
+
+class AutoSyncMsgpackCache(AutoSyncCacheBase, MsgpackPersistentCache):
+    '''
+    AutoSyncMsgpackCache defaults to a msgpack basis.
+    '''
+    def __init__(self, cache_name, **kwargs):
+        AutoSyncCacheBase.__init__(self, MsgpackPersistentCache, cache_name, **kwargs)
@@ -1,12 +1,17 @@
 import pickle
-from six.moves import cPickle
-from six import iteritems
+try:
+    # Python 2's C pickler is ~10x faster than the pure-Python module
+    import cPickle
+except ImportError:
+    cPickle = pickle
+import pickletools
 import shutil
 import os
 import sys
 import psutil
 import csv
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from .utils import random_name
 
@@ -17,6 +22,15 @@ else:
     text_read_mode = 'r'
     text_write_mode = 'w'
 
+# Large file buffer so the C pickler isn't stalled on small syscalls
+PICKLE_BUFFER_SIZE = 64 * 1024
+# Single os.write calls cap out around 2GB on most kernels; stay well under
+OS_WRITE_CHUNK_SIZE = 2 * 1024 * 1024
+# Marks the out-of-band buffer layout; a plain pickle file never starts with
+# this, so the loader can tell the formats apart instead of misreading pickle
+# opcodes as a buffer length
+OOB_PICKLE_MAGIC = b'CMOB\x05\n'
+
 def dict_loader(*arg, **kwargs):
     return {}
 
@@ -118,11 +132,60 @@ def fork_content_save(cache_name, contents, presaver, saver, cleaner, timeout, s
             # Exit aggresively -- we don't want cleanup to occur
             os._exit(0)
 
-def pickle_saver(cache_dir, cache_name, contents):
+def write_blob(path, data, durable=False):
+    '''
+    Writes an already-serialized blob with direct os.write calls rather than
+    many small buffered file.write calls. No fsync unless durable is set --
+    the tmp-then-rename dance already guards against partial files.
+    '''
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view[:OS_WRITE_CHUNK_SIZE]):]
+        if durable:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+_save_executor = None
+_pending_saves = set()
+
+def _threaded_save_executor():
+    global _save_executor
+    if _save_executor is None:
+        # Two workers lets one long pickle overlap the next request's save
+        _save_executor = ThreadPoolExecutor(max_workers=2)
+    return _save_executor
+
+def wait_for_threaded_saves():
+    '''
+    Blocks until every outstanding threaded save has finished. Called by the
+    executor's own shutdown hook at interpreter exit, but callers needing
+    durability sooner can invoke it directly.
+    '''
+    for future in list(_pending_saves):
+        try:
+            future.result()
+        except Exception as e:
+            print("Warning: ignored error in threaded cache saver - {}".format(repr(e)))
+
+def thread_content_save(cache_name, contents, saver):
+    def run_save():
+        try:
+            saver(cache_name, contents)
+        except Exception as e:
+            print("Warning: ignored error in '{}' cache saver - {}".format(cache_name, repr(e)))
+    future = _threaded_save_executor().submit(run_save)
+    _pending_saves.add(future)
+    future.add_done_callback(_pending_saves.discard)
+    return future
+
+def pickle_saver(cache_dir, cache_name, contents, optimize=False, durable=False):
     tmp_exts = ['tmp', random_name()]
     try:
         try:
-            pickle_pre_saver(cache_dir, cache_name, contents, tmp_exts)
+            pickle_pre_saver(cache_dir, cache_name, contents, tmp_exts, optimize, durable)
             pickle_mover(cache_dir, cache_name, contents, tmp_exts)
         except (IOError, EOFError):
             traceback.print_exc()
@@ -132,15 +195,19 @@ def pickle_saver(cache_dir, cache_name, contents):
         except: pass
         raise
 
-def pickle_pre_saver(cache_dir, cache_name, contents, extensions):
+def pickle_pre_saver(cache_dir, cache_name, contents, extensions, optimize=False, durable=False):
     ensure_directory(cache_dir)
     cache_path = generate_pickle_path(cache_dir, cache_name)
-    with open('.'.join([cache_path] + extensions), 'wb') as pkl_file:
-        try:
-            cPickle.dump(contents, pkl_file)
-        except:
-            # We do this because older cPickle was incorrectly raising exceptions
-            pickle.dump(contents, pkl_file)
+    try:
+        data = cPickle.dumps(contents, protocol=pickle.HIGHEST_PROTOCOL)
+    except:
+        # We do this because older cPickle was incorrectly raising exceptions
+        data = pickle.dumps(contents, protocol=pickle.HIGHEST_PROTOCOL)
+    if optimize:
+        # Stripping redundant PUT/memo opcodes shrinks the file and speeds
+        # up every later load at a modest one-time save cost
+        data = pickletools.optimize(data)
+    write_blob('.'.join([cache_path] + extensions), data, durable)
 
 def pickle_mover(cache_dir, cache_name, contents, extensions):
     cache_path = generate_pickle_path(cache_dir, cache_name)
@@ -151,19 +218,87 @@ def pickle_cleaner(cache_dir, cache_name, extensions):
     try: os.remove('.'.join([cache_path] + extensions))
     except OSError: pass
 
+def pickle_stat(cache_dir, cache_name):
+    '''
+    Cheap (mtime_ns, size) fingerprint of the saved pickle, or None when the
+    file is missing or unreadable.
+    '''
+    try:
+        stat = os.stat(generate_pickle_path(cache_dir, cache_name))
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
 def pickle_deleter(cache_dir, cache_name):
     try:
         os.remove(generate_pickle_path(cache_dir, cache_name))
     except OSError:
         pass
 
+def pickle_oob_saver(cache_dir, cache_name, contents):
+    tmp_exts = ['tmp', random_name()]
+    try:
+        try:
+            pickle_oob_pre_saver(cache_dir, cache_name, contents, tmp_exts)
+            pickle_mover(cache_dir, cache_name, contents, tmp_exts)
+        except (IOError, EOFError):
+            traceback.print_exc()
+            raise IOError('Unable to save {} cache'.format(cache_name))
+    except:
+        try: pickle_cleaner(cache_dir, cache_name, tmp_exts)
+        except: pass
+        raise
+
+def pickle_oob_pre_saver(cache_dir, cache_name, contents, extensions):
+    '''
+    Writes contents with pickle protocol 5 out-of-band buffers (Python 3.8+).
+    Large bytes/bytearray/numpy payloads are written straight from their
+    original memory instead of being copied into the pickle stream. The file
+    holds a magic header, then a length-prefixed pickle followed by
+    length-prefixed raw buffers.
+    '''
+    ensure_directory(cache_dir)
+    cache_path = generate_pickle_path(cache_dir, cache_name)
+    buffers = []
+    data = pickle.dumps(contents, protocol=5, buffer_callback=buffers.append)
+    with open('.'.join([cache_path] + extensions), 'wb', buffering=PICKLE_BUFFER_SIZE) as pkl_file:
+        pkl_file.write(OOB_PICKLE_MAGIC)
+        pkl_file.write(len(data).to_bytes(8, 'little'))
+        pkl_file.write(data)
+        for buf in buffers:
+            raw = buf.raw()
+            pkl_file.write(raw.nbytes.to_bytes(8, 'little'))
+            pkl_file.write(raw)
+
+def pickle_oob_loader(cache_dir, cache_name):
+    try:
+        with open(generate_pickle_path(cache_dir, cache_name), 'rb', buffering=PICKLE_BUFFER_SIZE) as pkl_file:
+            # A missing or wrong magic means the file wasn't written in this
+            # layout (e.g. by the plain pickle saver) -- degrade to a rebuild
+            # like every other loader rather than misparsing it
+            if pkl_file.read(len(OOB_PICKLE_MAGIC)) != OOB_PICKLE_MAGIC:
+                return None
+            size = pkl_file.read(8)
+            if len(size) < 8:
+                return None
+            data = pkl_file.read(int.from_bytes(size, 'little'))
+            buffers = []
+            while True:
+                size = pkl_file.read(8)
+                if len(size) < 8:
+                    break
+                buffers.append(pkl_file.read(int.from_bytes(size, 'little')))
+            return pickle.loads(data, buffers=buffers)
+    except (IOError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+
 def pickle_loader(cache_dir, cache_name):
     '''
     Default loader for any cache, this function loads from a pickle file based on cache name.
     '''
     contents = None
     try:
-        with open(generate_pickle_path(cache_dir, cache_name), 'rb') as pkl_file:
+        with open(generate_pickle_path(cache_dir, cache_name), 'rb', buffering=PICKLE_BUFFER_SIZE) as pkl_file:
             try:
                 contents = cPickle.load(pkl_file)
             except:
@@ -195,7 +330,7 @@ def csv_pre_saver(cache_dir, cache_name, contents, extensions, row_builder=None)
     cache_path = generate_csv_path(cache_dir, cache_name)
     with open('.'.join([cache_path] + extensions), text_write_mode) as csv_file:
         writer = csv.writer(csv_file, dialect='excel', quoting=csv.QUOTE_MINIMAL)
-        for key, value in iteritems(contents):
+        for key, value in contents.items():
             writer.writerow(row_builder(key, value) if row_builder else [key, value])
 
 def csv_mover(cache_dir, cache_name, contents, extensions):
@@ -45,6 +45,10 @@ setup(
     description='A dependent cache manager',
     long_description=read_md('README.md'),
     install_requires=required,
+    python_requires='>=3',
+    extras_require={
+        'msgpack': ['msgpack']
+    },
     license='New BSD',
     packages=['cacheman'],
     test_suite='tests',
@@ -57,7 +61,6 @@ setup(
         'Topic :: Utilities',
         'License :: OSI Approved :: BSD License',
         'Natural Language :: English',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3'
     ]
 )
@@ -77,6 +77,28 @@ class AutoSyncCacheTest(CacheCommonAsserter, unittest.TestCase):
         # No save should have triggered save from second time window
         self.assert_contents_equal(cache, dict((i, i) for i in range(10)))
 
+    def test_bulk_edit_counts(self):
+        # Thresholds high enough that no save fires and clears the buckets
+        cache = autosync.AutoSyncCache('bulk_counts', cache_manager=self.manager,
+                time_checks=[autosync.TimeCount(60, 1000000)], time_bucket_size=1)
+
+        # One edit per affected key, as if each went through __setitem__
+        cache.update({ 'a': 1, 'b': 2, 'c': 3 }, d=4)
+        self.assertEqual(sum(cache.time_counts), 4)
+
+        cache.setdefault('a', 'existing') # Nothing mutated
+        self.assertEqual(sum(cache.time_counts), 4)
+        cache.setdefault('e')
+        self.assertEqual(sum(cache.time_counts), 5)
+
+        cache.pop('missing', None) # Nothing removed
+        self.assertEqual(sum(cache.time_counts), 5)
+        cache.pop('a')
+        self.assertEqual(sum(cache.time_counts), 6)
+
+        cache.clear() # One edit per remaining key
+        self.assertEqual(sum(cache.time_counts), 10)
+
     def test_out_of_window(self):
         cache_name = 'out_of_bounds'
         cache = self.build_fast_sync_cache(cache_name)
@@ -0,0 +1,80 @@
+# This import fixes sys.path issues
+from . import parentpath
+
+import os
+import unittest
+try:
+    # Optional dependency -- install with CacheMan[msgpack]
+    from cacheman.msgpackcache import MsgpackPersistentCache, generate_msgpack_path
+except ImportError:
+    MsgpackPersistentCache = None
+from .common import CacheCommonAsserter
+
+@unittest.skipUnless(MsgpackPersistentCache, 'msgpack not installed')
+class MsgpackCacheTest(CacheCommonAsserter, unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        CacheCommonAsserter.__init__(self)
+        unittest.TestCase.__init__(self, *args, **kwargs)
+
+    def check_msgpack_cache(self, cache_name, presence):
+        assertion = self.assertTrue if presence else self.assertFalse
+        assertion(os.path.isfile(generate_msgpack_path(self.test_cache_dir, cache_name)))
+        return cache_name
+
+    def test_basic_msgpack_cache(self):
+        cache_name = self.check_msgpack_cache('msgpackcache', False)
+
+        cache = MsgpackPersistentCache(cache_name, cache_manager=self.manager)
+        cache['foo'] = 'bar'
+        cache.save()
+
+        self.check_msgpack_cache(cache_name, True)
+        cache.load() # Reload
+        self.check_msgpack_cache(cache_name, True)
+        self.assertEqual(cache['foo'], 'bar')
+
+        cache.delete_saved_content()
+        self.check_msgpack_cache(cache_name, False)
+        cache.load_or_build()
+        self.assert_contents_equal(cache, {})
+
+    def test_msgpack_save_and_load(self):
+        cache_name = 'msgpack_save_load'
+        cache = MsgpackPersistentCache(cache_name, cache_manager=self.manager)
+        cache['foo'] = [1, 2.5, 'three', None]
+        cache.save()
+
+        cache.contents = {}
+        cache.load()
+        self.assertEqual(cache['foo'], [1, 2.5, 'three', None])
+        cache.delete_saved_content()
+
+    def test_corrupt_file_rebuilds(self):
+        cache_name = 'msgpack_corrupt'
+        cache = MsgpackPersistentCache(cache_name, cache_manager=self.manager)
+        cache['foo'] = 'bar'
+        cache.save()
+
+        # Truncate the saved file; the loader should degrade to a rebuild
+        cache_path = generate_msgpack_path(self.test_cache_dir, cache_name)
+        with open(cache_path, 'rb') as msgpack_file:
+            data = msgpack_file.read()
+        with open(cache_path, 'wb') as msgpack_file:
+            msgpack_file.write(data[:-1])
+
+        cache.load_or_build()
+        self.assert_contents_equal(cache, {})
+        cache.delete_saved_content()
+
+    def test_rejects_non_dict_contents(self):
+        cache_name = 'msgpack_non_dict'
+        cache = MsgpackPersistentCache(cache_name, cache_manager=self.manager,
+            contents=['not', 'a', 'dict'])
+        cache.save()
+
+        cache.load_or_build() # Validator rejects the list, forcing a rebuild
+        self.assert_contents_equal(cache, {})
+        cache.delete_saved_content()
+
+if __name__ == '__main__':
+    unittest.main()
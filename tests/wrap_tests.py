@@ -2,6 +2,7 @@
 from . import parentpath
 
 import unittest
+from cacheman import registers
 from cacheman.cachewrap import CacheWrap, NonPersistentCache, PersistentCache
 from .common import CacheCommonAsserter
 
@@ -92,11 +93,48 @@ class CacheWrapTest(CacheCommonAsserter, unittest.TestCase):
         self.assertTrue(isinstance(cache.contents, list))
         self.assert_contents_equal(cache, [])
 
-    def test_delete_save(self):
+    def test_lazy_load_on_init(self):
+        cache_name = self.check_cache_gone('lazy_init')
+        load_calls = []
+        cache = CacheWrap(cache_name, cache_manager=self.manager,
+            loader=lambda *args: load_calls.append(args) or { 'foo': 'bar' })
+        self.assertEqual(load_calls, []) # Nothing touched, nothing loaded
+
+        self.assertEqual(cache['foo'], 'bar')
+        self.assertEqual(len(load_calls), 1)
+        self.assertEqual(cache['foo'], 'bar')
+        self.assertEqual(len(load_calls), 1) # Loaded exactly once
+
+    def test_eager_load_on_init(self):
+        cache_name = self.check_cache_gone('eager_init')
+        load_calls = []
+        CacheWrap(cache_name, cache_manager=self.manager, lazy=False,
+            loader=lambda *args: load_calls.append(args) or { 'foo': 'bar' })
+        self.assertEqual(len(load_calls), 1)
+
+    def test_delete_no_save(self):
         cache_name = self.check_cache_gone('deleted')
         cache = PersistentCache(cache_name, cache_manager=self.manager)
-        cache['foo'] = 'bar'
+        cache['foo'] = 'bar' # The initial build saves an empty cache before the edit
         cache.__del__() # To avoid lazy deletion calls/reference counts
+
+        # Teardown no longer saves implicitly, so the edit shouldn't persist
+        cache = PersistentCache(cache_name, cache_manager=self.manager)
+        self.assertNotIn('foo', cache)
+
+    def test_delete_untouched_lazy_cache(self):
+        cache_name = self.check_cache_gone('deleted_untouched')
+        cache = PersistentCache(cache_name, cache_manager=self.manager)
+        cache.__del__() # To avoid lazy deletion calls/reference counts
+
+        # Destruction must not trigger the deferred load/build (or its save)
+        self.check_cache_gone(cache_name)
+
+    def test_save_on_gc(self):
+        cache_name = self.check_cache_gone('gc_saved')
+        cache = PersistentCache(cache_name, cache_manager=self.manager, save_on_gc=True)
+        cache['foo'] = 'bar'
+        cache._save_finalizer() # Stands in for interpreter exit
         self.check_cache(cache_name, True)
 
         cache = PersistentCache(cache_name, cache_manager=self.manager)
@@ -112,12 +150,71 @@ class CacheWrapTest(CacheCommonAsserter, unittest.TestCase):
         with PersistentCache(cache_name, cache_manager=self.manager) as cache:
             self.assertEqual(cache['foo'], 'bar')
 
+    def test_optimized_save(self):
+        cache_name = self.check_cache_gone('optimized')
+        shared = ['repeated']
+        with PersistentCache(cache_name, cache_manager=self.manager, optimize_on_save=True) as cache:
+            cache['foo'] = shared
+            cache['bar'] = shared
+
+        cache = PersistentCache(cache_name, cache_manager=self.manager)
+        self.assertEqual(cache['foo'], ['repeated'])
+        self.assertEqual(cache['bar'], ['repeated'])
+
+    def test_oob_buffer_save(self):
+        cache_name = self.check_cache_gone('oob_buffers')
+        payload = bytearray(b'x' * 100000)
+        with PersistentCache(cache_name, cache_manager=self.manager, oob_buffers=True) as cache:
+            cache['blob'] = payload
+            cache['meta'] = 'small'
+
+        cache = PersistentCache(cache_name, cache_manager=self.manager, oob_buffers=True)
+        self.assertEqual(cache['blob'], payload)
+        self.assertEqual(cache['meta'], 'small')
+
+    def test_oob_loader_rejects_plain_pickle(self):
+        cache_name = self.check_cache_gone('oob_plain_file')
+        registers.pickle_saver(self.manager.cache_directory, cache_name, { 'foo': 'bar' })
+
+        # A plain pickle isn't in the out-of-band layout; degrade to a rebuild
+        cache = PersistentCache(cache_name, cache_manager=self.manager, oob_buffers=True)
+        self.assert_contents_equal(cache, {})
+
+    def test_threaded_save(self):
+        cache_name = self.check_cache_gone('threaded')
+        cache = PersistentCache(cache_name, cache_manager=self.manager, threaded_save=True)
+        cache['foo'] = 'bar'
+        cache.save()
+        registers.wait_for_threaded_saves()
+        self.check_cache(cache_name, True)
+
+        cache.contents = {}
+        cache.load()
+        self.assertEqual(cache['foo'], 'bar')
+
     def test_contains(self):
         cache_name = self.check_cache_gone('contains')
         cache = NonPersistentCache(cache_name, cache_manager=self.manager, contents={ 'foo': 'bar' })
         self.assertTrue('foo' in cache)
         self.assertFalse('foo2' in cache)
 
+    def test_mapping_passthroughs(self):
+        cache_name = self.check_cache_gone('mapping_ops')
+        cache = NonPersistentCache(cache_name, cache_manager=self.manager, contents={ 'foo': 'bar' })
+
+        self.assertEqual(sorted(cache.keys()), ['foo'])
+        self.assertEqual(sorted(cache.values()), ['bar'])
+        self.assertEqual(sorted(cache.items()), [('foo', 'bar')])
+        self.assertEqual(cache.get('foo'), 'bar')
+        self.assertIsNone(cache.get('missing'))
+
+        cache.update({ 'baz': 'qux' })
+        self.assertEqual(cache['baz'], 'qux')
+        self.assertEqual(cache.setdefault('new', 'val'), 'val')
+        self.assertEqual(cache.pop('new'), 'val')
+        cache.clear()
+        self.assert_contents_equal(cache, {})
+
     def test_save_and_load(self):
         cache_name = self.check_cache_gone('save_load')
         cache = PersistentCache(cache_name, cache_manager=self.manager)
@@ -130,6 +227,39 @@ class CacheWrapTest(CacheCommonAsserter, unittest.TestCase):
         cache.load()
         self.assertEqual(cache['foo'], 'bar')
 
+    def test_clean_save_skipped(self):
+        cache_name = self.check_cache_gone('clean_skip')
+        cache = PersistentCache(cache_name, cache_manager=self.manager)
+        cache['foo'] = 'bar'
+        cache.save()
+        self.check_cache(cache_name, True)
+
+        cache.delete_saved_content()
+        cache.save() # Unchanged contents shouldn't trigger a rewrite
+        self.check_cache_gone(cache_name)
+
+        cache.save(force=True)
+        self.check_cache(cache_name, True)
+
+    def test_unchanged_load_short_circuit(self):
+        cache_name = self.check_cache_gone('unchanged_load')
+        cache = PersistentCache(cache_name, cache_manager=self.manager)
+        cache['foo'] = 'bar'
+        cache.save()
+
+        first_contents = cache.contents
+        cache.load() # Nothing changed on disk, so no re-read happens
+        self.assertIs(cache.contents, first_contents)
+
+        cache.load(force=True) # Forced loads always re-read
+        self.assertIsNot(cache.contents, first_contents)
+        self.assertEqual(cache['foo'], 'bar')
+
+        # An external rewrite changes the file fingerprint and must be picked up
+        registers.pickle_saver(self.manager.cache_directory, cache_name, { 'foo': 'external' })
+        cache.load()
+        self.assertEqual(cache['foo'], 'external')
+
     def test_invalidate(self):
         cache_name = self.check_cache_gone('invalidate')
         cache = PersistentCache(cache_name, cache_manager=self.manager)
@@ -228,6 +358,47 @@ class CacheWrapTest(CacheCommonAsserter, unittest.TestCase):
         parent_cache.invalidate_and_rebuild(True)
         self.assertDictEqual(dependent_cache.contents, {})
 
+    def test_deep_dependent_chain(self):
+        # Deep chains shouldn't hit the recursion limit during traversals
+        depth = 1500
+        caches = [NonPersistentCache('chain_0', cache_manager=self.manager, contents={})]
+        for i in range(1, depth):
+            caches.append(NonPersistentCache('chain_{}'.format(i), cache_manager=self.manager,
+                contents={}, dependents=[caches[-1]]))
+
+        head = caches[-1]
+        head['foo'] = 'bar'
+        head.save(True)
+        head.load_or_build(True)
+        head.invalidate_and_rebuild(True)
+        self.assert_contents_equal(caches[0], {})
+
+    def test_dependent_cycle(self):
+        cache_one = NonPersistentCache('cycle_one', cache_manager=self.manager, contents={})
+        cache_two = NonPersistentCache('cycle_two', cache_manager=self.manager,
+            contents={}, dependents=['cycle_one'])
+        cache_one.add_dependent('cycle_two')
+
+        cache_one['foo'] = 'bar'
+        cache_one.save(True)
+        cache_one.invalidate_and_rebuild(True)
+        self.assert_contents_equal(cache_one, {})
+        self.assert_contents_equal(cache_two, {})
+
+    def test_dependent_replaced_after_deregister(self):
+        root = NonPersistentCache('replace_root', cache_manager=self.manager,
+            contents={}, dependents=['replace_leaf'])
+        leaf = NonPersistentCache('replace_leaf', cache_manager=self.manager, contents={})
+        root.invalidate_and_rebuild(True) # Memoizes the leaf resolution
+
+        leaf.__del__() # Deregisters from the manager
+        replacement = NonPersistentCache('replace_leaf', cache_manager=self.manager,
+            contents={ 'stale': True })
+
+        # Traversal should find the live replacement, not the memoized dead wrap
+        root.invalidate_and_rebuild(True)
+        self.assert_contents_equal(replacement, {})
+
     def test_pre_processor(self):
         cache_name = self.check_cache_gone('pre_process')
         cache = PersistentCache(cache_name, cache_manager=self.manager, contents={ 'foo': 'bar' },